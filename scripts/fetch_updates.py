@@ -1,14 +1,30 @@
+import asyncio
+import base64
 import json
 import os
-import requests
+import aiohttp
+import orjson
 from datetime import datetime, timedelta
-from dateutil import parser
+from operator import itemgetter
 import re
 import time
-from bs4 import BeautifulSoup
+from collections import defaultdict
+from urllib.parse import urlparse
 
 # --- 配置区 ---
 DATA_FILE = os.path.join(os.path.dirname(__file__), 'data.json')
+# 记录各URL的ETag/Last-Modified及上次响应内容，用于条件请求
+HTTP_CACHE_FILE = os.path.join(os.path.dirname(__file__), 'http_cache.json')
+# 每个主机的最大并发请求数
+MAX_CONCURRENCY_PER_HOST = 8
+# 遇到429/5xx时的最大重试次数
+MAX_RETRIES = 3
+# GitHub剩余配额低于该值时，后续请求等待配额重置
+RATE_LIMIT_MIN_REMAINING = 5
+# 等待配额重置的最长时间（秒），超过则直接放弃该接口
+MAX_RATE_LIMIT_WAIT = 60
+# 每个仓库只取最新的几个发布
+GITHUB_RELEASES_PER_PAGE = 5
 
 # 只关注重要公司的模型关键词和API映射
 MODEL_PATTERNS = {
@@ -59,42 +75,158 @@ MODEL_PATTERNS = {
     }
 }
 
+# 发布相关词汇，用于判断RSS条目是否为模型发布
+RELEASE_WORDS = ('release', 'launch', 'announce', 'unveil', 'introduce', 'available', 'new')
+
+def _compile_words(words):
+    """将多个关键字编译为一个正则，一次扫描即可判断是否包含任一关键字"""
+    return re.compile('|'.join(re.escape(word.lower()) for word in words))
+
+# 预先编译各公司的关键字正则，避免每条数据重复计算
+_RELEASE_RE = _compile_words(RELEASE_WORDS)
+for _info in MODEL_PATTERNS.values():
+    _info['_kw_re'] = _compile_words(_info['keywords'])
+
+# 预编译版本号正则
+_VERSION_RE = re.compile(r'^v?(\d+\.)*\d+')
+
 class IntelligentModelTracker:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        }
+        self.http_cache = self.load_http_cache()
+        self._host_sems = defaultdict(lambda: asyncio.Semaphore(MAX_CONCURRENCY_PER_HOST))
+        self._rate_limit_reset = {}
+        # 每次运行只计算一次今天的日期
+        self._today_str = datetime.now().strftime('%Y-%m-%d')
+        # (公司, 模型名称)去重索引，由fetch_all_updates根据现有数据建立
+        self._key_set = set()
         
     def load_existing_data(self):
         """加载现有数据"""
         try:
-            with open(DATA_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
+            with open(DATA_FILE, 'rb') as f:
+                return orjson.loads(f.read())
+        except (FileNotFoundError, orjson.JSONDecodeError):
             return []
     
-    def save_data(self, data):
+    def save_data(self, new_updates, existing_data):
         """保存数据到文件"""
-        # 按日期排序，最新的在前面
-        data.sort(key=lambda x: datetime.strptime(x['update_date'], '%Y-%m-%d'), reverse=True)
+        # 现有数据已按日期倒序保存，新数据均为今日发布，只需排序后放在最前面
+        # 日期为YYYY-MM-DD格式，按字符串排序即可保证日期顺序
+        new_updates = sorted(new_updates, key=itemgetter('update_date'), reverse=True)
+        data = new_updates + existing_data
         
-        with open(DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        with open(DATA_FILE, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    
+    def load_http_cache(self):
+        """加载HTTP条件请求缓存"""
+        try:
+            with open(HTTP_CACHE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+    
+    def save_http_cache(self):
+        """保存HTTP条件请求缓存"""
+        with open(HTTP_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(self.http_cache, f, ensure_ascii=False)
     
-    def fetch_github_releases(self, repo_url):
+    async def fetch_with_cache(self, session, url, headers=None):
+        """发送带If-None-Match/If-Modified-Since的条件请求，内容未变化(304)时返回缓存内容（原始字节）"""
+        # 响应体以base64保存，保证RSS等非UTF-8内容原样往返
+        cached = self.http_cache.get(url, {})
+        headers = dict(headers or {})
+        if 'body_b64' in cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        
+        response, body = await self.get_with_retry(session, url, headers)
+        if response.status == 304 and 'body_b64' in cached:
+            return base64.b64decode(cached['body_b64'])
+        response.raise_for_status()
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        # 没有ETag/Last-Modified时无法发送条件请求，缓存内容也无法复用
+        if etag or last_modified:
+            self.http_cache[url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "body_b64": base64.b64encode(body).decode('ascii'),
+            }
+        else:
+            self.http_cache.pop(url, None)
+        return body
+    
+    async def get_with_retry(self, session, url, headers):
+        """按主机限制并发的GET请求，遇到429/5xx时指数退避重试，GitHub配额耗尽时等待重置后重发"""
+        host = urlparse(url).netloc
+        for attempt in range(MAX_RETRIES + 1):
+            # 在占用并发名额之前等待配额重置
+            await self.wait_for_rate_limit(host)
+            async with self._host_sems[host]:
+                async with session.get(url, headers=headers) as response:
+                    body = await response.read()
+            self.record_rate_limit(host, response)
+            if attempt == MAX_RETRIES:
+                break
+            if response.status in (403, 429) and response.headers.get('X-RateLimit-Remaining') == '0':
+                wait_seconds = self.rate_limit_wait_seconds(host)
+                if wait_seconds > MAX_RATE_LIMIT_WAIT:
+                    print(f"  GitHub API配额已用尽，{int(wait_seconds)} 秒后才重置，跳过 {url}")
+                    break
+                continue
+            if response.status == 429 or response.status >= 500:
+                print(f"  请求 {url} 返回 {response.status}，{2 ** attempt} 秒后重试...")
+                await asyncio.sleep(2 ** attempt)
+                continue
+            break
+        return response, body
+    
+    def record_rate_limit(self, host, response):
+        """GitHub剩余配额不足时，记录该主机的配额重置时间"""
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        if remaining is not None and reset is not None and int(remaining) < RATE_LIMIT_MIN_REMAINING:
+            self._rate_limit_reset[host] = int(reset)
+    
+    def rate_limit_wait_seconds(self, host):
+        """距离该主机配额重置还需等待的秒数"""
+        reset = self._rate_limit_reset.get(host)
+        if reset is None:
+            return 0
+        # 多等1秒，避免恰好在重置时刻之前发出请求
+        return max(0, reset - time.time() + 1)
+    
+    async def wait_for_rate_limit(self, host):
+        """发出请求前，若该主机配额即将耗尽且很快重置，则等待到重置时间"""
+        wait_seconds = self.rate_limit_wait_seconds(host)
+        if 0 < wait_seconds <= MAX_RATE_LIMIT_WAIT:
+            print(f"  {host} 配额即将耗尽，等待 {int(wait_seconds)} 秒后继续...")
+            await asyncio.sleep(wait_seconds)
+    
+    async def fetch_github_releases(self, session, repo_url):
         """从GitHub API获取最新发布信息"""
         try:
-            response = self.session.get(repo_url, timeout=10)
-            if response.status_code == 200:
-                releases = response.json()
-                return releases[:5]  # 只取最新的5个发布
+            # 设置GITHUB_TOKEN后使用认证请求：未认证为60次/小时，
+            # Actions内置GITHUB_TOKEN为每仓库1000次/小时，个人令牌为5000次/小时
+            headers = {'Accept': 'application/vnd.github+json'}
+            if os.environ.get('GITHUB_TOKEN'):
+                headers['Authorization'] = f"Bearer {os.environ['GITHUB_TOKEN']}"
+            url = f"{repo_url}?per_page={GITHUB_RELEASES_PER_PAGE}"
+            return json.loads(await self.fetch_with_cache(session, url, headers))
         except Exception as e:
             print(f"获取GitHub发布信息失败: {repo_url}, 错误: {e}")
         return []
     
     def extract_model_info_from_github(self, release, company):
         """从GitHub发布信息中提取模型信息"""
+        from dateutil import parser
+        
         try:
             # 解析发布日期
             published_at = parser.parse(release['published_at']).strftime('%Y-%m-%d')
@@ -103,21 +235,23 @@ class IntelligentModelTracker:
             model_name = release.get('name', release.get('tag_name', 'Unknown'))
 
             # 如果模型名称仅仅是版本号，则跳过
-            if re.fullmatch(r'v?(\d+\.)*\d+', model_name):
+            if _VERSION_RE.fullmatch(model_name):
                 return None
             
             # 清理模型名称
-            cleaned_model_name = re.sub(r'^v?(\d+\.)*\d+', '', model_name).strip('-').strip()
+            cleaned_model_name = _VERSION_RE.sub('', model_name).strip('-').strip()
             
             if not cleaned_model_name:
                 cleaned_model_name = model_name
 
             # 提取特性描述
-            features = release.get('body', '')[:500]  # 限制长度
+            # GitHub可能返回 "body": null
+            body = release.get('body') or ''
+            features = body[:500]  # 限制长度
 
             # 检查标题或特性描述是否包含关键字，增加相关性
-            title_and_features = f"{cleaned_model_name} {features}"
-            if not any(keyword.lower() in title_and_features.lower() for keyword in MODEL_PATTERNS[company]['keywords']):
+            title_and_features = f"{cleaned_model_name} {features}".lower()
+            if not MODEL_PATTERNS[company]['_kw_re'].search(title_and_features):
                  return None
             
             return {
@@ -131,100 +265,119 @@ class IntelligentModelTracker:
         return None
     
     def is_today_update(self, update_date):
-        """检查是否为今天发布的更新"""
-        try:
-            update_dt = datetime.strptime(update_date, '%Y-%m-%d')
-            today = datetime.now().date()
-            return update_dt.date() == today
-        except:
-            return False
+        """检查是否为今天发布的更新（日期均为YYYY-MM-DD格式，直接比较字符串）"""
+        return update_date == self._today_str
     
-    def is_duplicate(self, new_item, existing_data):
-        """检查是否为重复数据"""
-        for item in existing_data:
-            # 检查模型名称和公司是否相同
-            if (item.get('company') == new_item.get('company') and 
-                item.get('model_name') == new_item.get('model_name')):
-                return True
-        
-        return False
+    def is_duplicate(self, new_item):
+        """检查是否为重复数据（公司和模型名称相同）"""
+        return (new_item.get('company'), new_item.get('model_name')) in self._key_set
+    
+    def add_update(self, new_item, new_updates):
+        """记录新数据并加入去重索引"""
+        new_updates.append(new_item)
+        self._key_set.add((new_item.get('company'), new_item.get('model_name')))
     
-    def fetch_official_rss_updates(self):
-        """从官方RSS源获取AI模型更新信息"""
+    def extract_updates_from_rss(self, body, company):
+        """从RSS源内容中提取今日发布的模型更新"""
         import feedparser
         
         updates = []
-        for company, info in MODEL_PATTERNS.items():
-            for rss_url in info.get('official_sites', []):
-                try:
-                    print(f"  正在检查 {company} 官方RSS...")
-                    feed = feedparser.parse(rss_url)
-                    
-                    for entry in feed.entries[:5]:  # 只取最新5条
-                        title_lower = entry.title.lower()
-                        summary_lower = entry.get('summary', '').lower()
+        info = MODEL_PATTERNS[company]
+        try:
+            feed = feedparser.parse(body)
+            # 只保留需要的字段，尽早释放完整的feed对象
+            entries = [{
+                "title": entry.get('title', ''),
+                "summary": entry.get('summary', ''),
+                "published_parsed": entry.get('published_parsed'),
+            } for entry in feed.entries[:5]]  # 只取最新5条
+            del feed
+            
+            for entry in entries:
+                title_lower = entry['title'].lower()
+                summary_lower = entry['summary'].lower()
+                
+                # 检查是否包含模型相关关键词
+                if info['_kw_re'].search(title_lower) or info['_kw_re'].search(summary_lower):
+                    # 检查是否为模型发布相关
+                    if _RELEASE_RE.search(title_lower):
+                        published_date = entry['published_parsed']
+                        if published_date:
+                            update_date = time.strftime('%Y-%m-%d', published_date)
+                        else:
+                            update_date = self._today_str
                         
-                        # 检查是否包含模型相关关键词
-                        if any(keyword.lower() in title_lower or keyword.lower() in summary_lower 
-                               for keyword in info['keywords']):
-                            # 检查是否为模型发布相关
-                            if any(word in title_lower for word in ['release', 'launch', 'announce', 'unveil', 'introduce', 'available', 'new']):
-                                published_date = entry.get('published_parsed')
-                                if published_date:
-                                    update_date = time.strftime('%Y-%m-%d', published_date)
-                                else:
-                                    update_date = datetime.now().strftime('%Y-%m-%d')
-                                
-                                # 只要今天发布的
-                                if self.is_today_update(update_date):
-                                    updates.append({
-                                        "company": company,
-                                        "model_name": entry.title,
-                                        "update_date": update_date,
-                                        "features": entry.get('summary', '')[:300],
-                                    })
-                                    print(f"    ✅ 发现今日官方发布: {entry.title}")
-                except Exception as e:
-                    print(f"    ❌ 获取 {company} RSS失败: {e}")
-                    continue
+                        # 只要今天发布的
+                        if self.is_today_update(update_date):
+                            updates.append({
+                                "company": company,
+                                "model_name": entry['title'],
+                                "update_date": update_date,
+                                "features": entry['summary'][:300],
+                            })
+        except Exception as e:
+            print(f"    ❌ 解析 {company} RSS失败: {e}")
         
         return updates
     
-    def fetch_all_updates(self):
+    async def fetch_all_updates(self):
         """获取所有来源的今日更新"""
-        today_str = datetime.now().strftime('%Y-%m-%d')
+        today_str = self._today_str
         print(f"🤖 开始抓取 {today_str} 的AI模型更新...")
         print("📋 关注公司: OpenAI, Anthropic, Google, Meta, xAI, DeepSeek, Alibaba(Qwen), Moonshot(Kimi), ByteDance(豆包)")
         
         existing_data = self.load_existing_data()
         new_updates = []
+        # 以(公司, 模型名称)建立去重索引，避免每条候选数据都遍历全部历史
+        self._key_set = {(item.get('company'), item.get('model_name')) for item in existing_data}
+        
+        # 所有RSS源和GitHub接口在同一个会话中并发请求
+        rss_feeds = [(company, rss_url)
+                     for company, info in MODEL_PATTERNS.items()
+                     for rss_url in info.get('official_sites', [])]
+        github_endpoints = [(company, api_endpoint)
+                            for company, info in MODEL_PATTERNS.items()
+                            for api_endpoint in info['api_endpoints']]
+        print("\n🌐 正在并发请求官方RSS源和GitHub...")
+        connector = aiohttp.TCPConnector(limit_per_host=MAX_CONCURRENCY_PER_HOST)
+        timeout = aiohttp.ClientTimeout(total=10)
+        async with aiohttp.ClientSession(headers=self.headers, connector=connector, timeout=timeout) as session:
+            results = await asyncio.gather(
+                *(self.fetch_with_cache(session, rss_url) for _, rss_url in rss_feeds),
+                *(self.fetch_github_releases(session, api_endpoint) for _, api_endpoint in github_endpoints),
+                return_exceptions=True
+            )
+        self.save_http_cache()
+        rss_bodies, github_releases = results[:len(rss_feeds)], results[len(rss_feeds):]
         
         # 1. 从官方RSS源获取更新
         print("\n📰 正在从官方RSS源获取今日更新...")
-        rss_updates = self.fetch_official_rss_updates()
-        for update in rss_updates:
-            if not self.is_duplicate(update, existing_data + new_updates):
-                new_updates.append(update)
+        for (company, _), body in zip(rss_feeds, rss_bodies):
+            print(f"  正在检查 {company} 官方RSS...")
+            if isinstance(body, Exception):
+                print(f"    ❌ 获取 {company} RSS失败: {body}")
+                continue
+            for update in self.extract_updates_from_rss(body, company):
+                if not self.is_duplicate(update):
+                    self.add_update(update, new_updates)
+                    print(f"    ✅ 发现今日官方发布: {update['model_name']}")
         
         # 2. 从GitHub获取更新
         print("\n📦 正在从GitHub获取今日更新...")
-        for company, info in MODEL_PATTERNS.items():
-            for api_endpoint in info['api_endpoints']:
-                print(f"  正在检查 {company} GitHub...")
-                releases = self.fetch_github_releases(api_endpoint)
-                for release in releases:
-                    model_info = self.extract_model_info_from_github(release, company)
-                    if (model_info and 
-                        self.is_today_update(model_info['update_date']) and
-                        not self.is_duplicate(model_info, existing_data + new_updates)):
-                        new_updates.append(model_info)
-                        print(f"    ✅ 发现今日GitHub发布: {model_info['model_name']}")
+        for (company, _), releases in zip(github_endpoints, github_releases):
+            print(f"  正在检查 {company} GitHub...")
+            for release in releases:
+                model_info = self.extract_model_info_from_github(release, company)
+                if (model_info and 
+                    self.is_today_update(model_info['update_date']) and
+                    not self.is_duplicate(model_info)):
+                    self.add_update(model_info, new_updates)
+                    print(f"    ✅ 发现今日GitHub发布: {model_info['model_name']}")
         
         # 4. 保存更新
         if new_updates:
             print(f"\n🎉 发现 {len(new_updates)} 个今日新发布的模型，正在保存...")
-            all_data = existing_data + new_updates
-            self.save_data(all_data)
+            self.save_data(new_updates, existing_data)
             print("✅ 数据已成功更新到 data.json")
             
             # 打印新更新摘要
@@ -237,7 +390,7 @@ class IntelligentModelTracker:
 def fetch_updates():
     """主函数：智能抓取AI模型更新"""
     tracker = IntelligentModelTracker()
-    tracker.fetch_all_updates()
+    asyncio.run(tracker.fetch_all_updates())
 
 if __name__ == "__main__":
     fetch_updates()
\ No newline at end of file